@@ -11,34 +11,47 @@ Author: EPISCAN Team
 Date: 2026-02-01
 """
 
+import asyncio
+import json
+import logging
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import statistics
-
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+import math
+
+import asyncpg
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from supabase import create_client, Client
 from dotenv import load_dotenv
 from mangum import Mangum
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("episcan")
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+DATABASE_URL = os.getenv("DATABASE_URL")  # Direct Postgres connection string (Supabase pooler)
+REDIS_URL = os.getenv("REDIS_URL")  # Optional: enables the shared baseline cache
+DEBUG_ALERTS = os.getenv("DEBUG_ALERTS", "0") == "1"  # Store Z-score internals in alert snapshots
 FASTAPI_PORT = int(os.getenv("FASTAPI_PORT", "8000"))
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise ValueError("Missing required environment variables: SUPABASE_URL or SUPABASE_SERVICE_KEY")
+# Serverless (Vercel) instances handle one request per invocation and may be
+# frozen in between. Vercel sets VERCEL=1; SERVERLESS=1/0 overrides detection.
+SERVERLESS = os.getenv("SERVERLESS", "1" if os.getenv("VERCEL") else "0") == "1"
 
-# Initialize Supabase client with service role key (bypasses RLS for backend operations)
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+if not DATABASE_URL:
+    raise ValueError("Missing required environment variable: DATABASE_URL")
 
 # ============================================================================
 # SEVERITY WEIGHTS
@@ -61,6 +74,133 @@ SEVERITY_WEIGHTS = {
     "severe": 2.5,
 }
 
+# ============================================================================
+# ALERTS SCHEDULING & CACHE
+# ============================================================================
+# Outbreak detection runs off the request path: on a long-lived server a
+# background task recomputes alerts every ALERTS_REFRESH_INTERVAL_SECONDS and
+# stores the result as a snapshot row in the outbreak_alerts table. /alerts
+# serves the newest snapshot, memoized in-process for ALERTS_CACHE_TTL_SECONDS.
+#
+# Serverless instances run no scheduler. When no snapshot is younger than
+# ALERTS_SNAPSHOT_MAX_AGE_SECONDS (serverless, or a server's first request),
+# the request runs detection itself and stores a fresh snapshot, which other
+# instances then reuse. Snapshots past ALERTS_SNAPSHOT_RETENTION_SECONDS are
+# deleted whenever a new one is stored.
+
+ALERTS_REFRESH_INTERVAL_SECONDS = 5 * 60
+ALERTS_SNAPSHOT_MAX_AGE_SECONDS = 10 * 60
+ALERTS_SNAPSHOT_RETENTION_SECONDS = 24 * 60 * 60
+ALERTS_CACHE_TTL_SECONDS = 60
+
+_alerts_cache: Dict = {"alerts": None, "expires_at": 0.0}
+_alerts_cache_lock = asyncio.Lock()
+
+# The 7-day baseline is made of whole UTC days, so it only changes at
+# midnight. Its per-location daily scores are cached in Redis (when
+# REDIS_URL is set) under a key for the current UTC date; the TTL just
+# cleans up old days.
+BASELINE_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# ============================================================================
+# REPORT MICRO-BATCHING
+# ============================================================================
+# Check-ins arrive in bursts (e.g. every morning). Instead of one INSERT and
+# one database round trip per request, submissions are queued and a
+# background writer inserts everything that arrived within
+# REPORT_BATCH_WINDOW_SECONDS (or REPORT_BATCH_MAX_SIZE reports) with a
+# single multi-row INSERT. Each request waits only for its own row. If a
+# batch is rejected for its data (e.g. an unknown user_id), it is split and
+# retried so only the offending reports fail.
+#
+# Batching only runs on a long-lived server. A serverless invocation has no
+# other requests to batch with, so it writes its report directly.
+
+REPORT_BATCH_WINDOW_SECONDS = 0.1
+REPORT_BATCH_MAX_SIZE = 500
+REPORT_SAVE_TIMEOUT_SECONDS = 10  # A request gives up (504) if its row isn't stored by then
+
+# ============================================================================
+# DATABASE CONNECTION POOL
+# ============================================================================
+# Outbreak detection reads go straight to Postgres over asyncpg instead of the
+# PostgREST HTTP API. The pool keeps connections open between requests, so each
+# /alerts call skips the connect + HTTP + JSON round trip.
+#
+# Prepared statements: asyncpg prepares each query once per connection and
+# reuses the statement (skipping Postgres parse/plan) on later calls, so the
+# detector's fixed SQL is only planned once per pooled connection. The Supabase
+# pooler (Supavisor) in transaction mode (port 6543) cannot keep named
+# prepared statements across transactions, so the cache is disabled there;
+# session mode (port 5432) or a direct connection keeps it on.
+#
+# The pool is created lazily at module level, so warm serverless invocations
+# reuse it instead of reconnecting. On serverless it keeps no idle minimum
+# and stays small, since each instance serves one request at a time.
+
+SUPAVISOR_TRANSACTION_PORT = 6543
+DB_STATEMENT_CACHE_SIZE = 0 if urlparse(DATABASE_URL).port == SUPAVISOR_TRANSACTION_PORT else 100
+
+_db_pool: Optional[asyncpg.Pool] = None
+_db_pool_lock = asyncio.Lock()
+
+# Redis connects lazily on first command, so the client can be module level too
+redis_client: Optional[Redis] = Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Set by lifespan on long-lived servers; None means reports are written directly
+_report_queue: Optional[asyncio.Queue] = None
+
+
+async def get_db_pool() -> asyncpg.Pool:
+    """Return the shared Postgres pool, creating it on first use"""
+    global _db_pool
+
+    if _db_pool is None:
+        async with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = await asyncpg.create_pool(
+                    DATABASE_URL,
+                    min_size=0 if SERVERLESS else 5,
+                    max_size=5 if SERVERLESS else 20,
+                    max_inactive_connection_lifetime=300,
+                    statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                )
+    return _db_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Long-lived server (uvicorn) startup/shutdown: open the pool, start the
+    report writer and (unless SERVERLESS) the alerts scheduler, and on
+    shutdown stop them, save any reports still queued and close connections.
+    Not run on serverless (the Mangum handler below disables lifespan).
+    """
+    global _db_pool, _report_queue
+
+    pool = await get_db_pool()
+    _report_queue = None if SERVERLESS else asyncio.Queue()
+    report_writer = None if SERVERLESS else asyncio.create_task(run_report_writer(pool, _report_queue))
+    # SERVERLESS forced on under uvicorn: rely on the /alerts fallback instead
+    scheduler = None if SERVERLESS else asyncio.create_task(run_alerts_scheduler(pool, redis_client))
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            scheduler.cancel()
+        if report_writer is not None:
+            # Stop accepting new reports, let the writer finish its current
+            # batch, then save anything queued behind the stop marker
+            queue, _report_queue = _report_queue, None
+            queue.put_nowait(None)
+            await report_writer
+            await flush_report_queue(pool, queue)
+        if redis_client is not None:
+            await redis_client.aclose()
+        await pool.close()
+        _db_pool = None
+
+
 # ============================================================================
 # FASTAPI APP INITIALIZATION
 # ============================================================================
@@ -69,7 +209,8 @@ app = FastAPI(
     title="EPISCAN API",
     description="AI-powered early warning system for school disease outbreaks",
     version="1.1.0",
-    root_path="/api"
+    root_path="/api",
+    lifespan=lifespan
 )
 
 # Configure CORS to allow requests from React frontend
@@ -93,7 +234,8 @@ app.add_middleware(
 
 class HealthReportSubmission(BaseModel):
     """Schema for incoming health report submissions from students"""
-    user_id: str = Field(..., description="UUID of the student submitting the report")
+    report_id: Optional[uuid.UUID] = Field(None, description="Client-generated report UUID; resending it never stores the report twice")
+    user_id: uuid.UUID = Field(..., description="UUID of the student submitting the report")
     symptoms: List[str] = Field(default=[], description="List of symptoms (e.g., ['fever', 'cough'])")
     temperature: Optional[float] = Field(None, description="Body temperature in Celsius", ge=35.0, le=43.0)
     location: str = Field(..., description="Location identifier (e.g., 'Hostel A')")
@@ -103,6 +245,7 @@ class HealthReportSubmission(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
+                "report_id": "123e4567-e89b-12d3-a456-426614174000",
                 "user_id": "550e8400-e29b-41d4-a716-446655440000",
                 "symptoms": ["fever", "headache", "fatigue"],
                 "temperature": 38.5,
@@ -123,6 +266,147 @@ class OutbreakAlert(BaseModel):
     detection_time: str
 
 
+# ============================================================================
+# REPORT WRITER
+# ============================================================================
+
+# Multi-row insert: the batch is passed as one JSON array parameter, so a
+# batch of any size is a single statement and a single round trip.
+#
+# Inserts are idempotent on the report id: a resent report (e.g. a client
+# retrying after a 504) is not stored again, and the original row's
+# created_at is returned instead. The second SELECT sees the table as it was
+# before this statement, so it only finds reports stored by earlier requests.
+INSERT_HEALTH_REPORTS_SQL = """
+    WITH batch AS (
+        SELECT *
+        FROM jsonb_to_recordset($1::jsonb) AS r(
+            id UUID, user_id UUID, symptoms TEXT[], temperature FLOAT8,
+            location TEXT, severity TEXT, notes TEXT, created_at TIMESTAMPTZ
+        )
+    ),
+    inserted AS (
+        INSERT INTO public.health_reports
+            (id, user_id, symptoms, temperature, location, severity, notes, created_at)
+        SELECT id, user_id, symptoms, temperature, location, severity, notes, created_at
+        FROM batch
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id, created_at
+    )
+    SELECT id, created_at FROM inserted
+    UNION ALL
+    SELECT existing.id, existing.created_at
+    FROM public.health_reports AS existing
+    JOIN batch ON batch.id = existing.id AND batch.user_id = existing.user_id
+"""
+
+
+async def write_report_batch(pool: asyncpg.Pool, batch: List[Tuple[Dict, asyncio.Future]]):
+    """
+    Insert a batch of queued reports and resolve each submitter's future
+    with the stored created_at. Report IDs are generated before queueing,
+    which is how results are matched back to their requests.
+
+    If Postgres rejects the row data, the batch is split in half and each
+    half retried, so one bad report (e.g. a user_id missing from auth.users)
+    only fails its own request. Any other error (connection lost, server
+    shutting down, statement cancelled) would fail every retry too, so it
+    fails the whole batch at once.
+    """
+    try:
+        records = await pool.fetch(INSERT_HEALTH_REPORTS_SQL, json.dumps([row for row, _ in batch]))
+    except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as e:
+        if len(batch) > 1:
+            middle = len(batch) // 2
+            await write_report_batch(pool, batch[:middle])
+            await write_report_batch(pool, batch[middle:])
+            return
+        _fail_reports(batch, e)
+        return
+    except Exception as e:
+        _fail_reports(batch, e)
+        return
+
+    created_at_by_id = {str(record["id"]): record["created_at"] for record in records}
+    for row, future in batch:
+        if future.done():
+            continue  # Client went away while waiting
+        if row["id"] in created_at_by_id:
+            future.set_result(created_at_by_id[row["id"]])
+        else:
+            future.set_exception(RuntimeError("Failed to save health report"))
+
+
+def _fail_reports(batch: List[Tuple[Dict, asyncio.Future]], error: Exception):
+    """Fail every still-waiting request in the batch with the given error"""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+async def run_report_writer(pool: asyncpg.Pool, queue: asyncio.Queue):
+    """
+    Background task: wait for the first queued report, collect whatever else
+    arrives within REPORT_BATCH_WINDOW_SECONDS (up to REPORT_BATCH_MAX_SIZE),
+    then write the batch. A None item is the shutdown marker: the batch in
+    progress is written, then the task returns.
+    """
+    loop = asyncio.get_running_loop()
+
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+
+        batch = [item]
+        stopping = False
+        deadline = loop.time() + REPORT_BATCH_WINDOW_SECONDS
+
+        while len(batch) < REPORT_BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        await write_report_batch(pool, batch)
+        if stopping:
+            return
+
+
+async def flush_report_queue(pool: asyncpg.Pool, queue: asyncio.Queue):
+    """Write any reports still queued (used on shutdown)"""
+    while not queue.empty():
+        batch = []
+        while not queue.empty() and len(batch) < REPORT_BATCH_MAX_SIZE:
+            item = queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+        if batch:
+            await write_report_batch(pool, batch)
+
+
+async def save_report(row: Dict) -> datetime:
+    """Store one report (batched on a long-lived server) and return its created_at"""
+    future = asyncio.get_running_loop().create_future()
+
+    if _report_queue is not None:
+        # Queue for the next batched insert
+        await _report_queue.put((row, future))
+    else:
+        # Serverless: nothing to batch with, write it now
+        await write_report_batch(await get_db_pool(), [(row, future)])
+
+    # Wait until the report is stored
+    return await future
+
+
 # ============================================================================
 # ENDPOINT 1: SUBMIT HEALTH REPORT
 # ============================================================================
@@ -137,36 +421,49 @@ async def submit_health_report(report: HealthReportSubmission):
     - Validates temperature range (35-43°C)
     - Sanitizes input data
 
+    On a long-lived server the report is queued and written together with
+    other submissions that arrive within ~100ms; the response is sent once
+    its row is stored.
+
     **Returns:**
     - 201 Created: Report successfully saved
     - 400 Bad Request: Invalid data
     - 500 Internal Server Error: Database error
+    - 504 Gateway Timeout: Report not confirmed within REPORT_SAVE_TIMEOUT_SECONDS.
+      It may still be stored; resend it with the same report_id to find out.
     """
+    report_id = report.report_id or uuid.uuid4()
+
     try:
-        # Insert health report into Supabase
-        response = supabase.table("health_reports").insert({
-            "user_id": report.user_id,
+        row = {
+            "id": str(report_id),
+            "user_id": str(report.user_id),
             "symptoms": report.symptoms,
             "temperature": report.temperature,
             "location": report.location,
             "severity": report.severity,
             "notes": report.notes,
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
-
-        # Check if insertion was successful
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to save health report"
-            )
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        created_at = await asyncio.wait_for(save_report(row), REPORT_SAVE_TIMEOUT_SECONDS)
 
         return {
             "message": "Health report submitted successfully",
-            "report_id": response.data[0]["id"],
-            "timestamp": response.data[0]["created_at"]
+            "report_id": row["id"],
+            "timestamp": created_at.isoformat()
         }
 
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=(
+                f"Health report {report_id} was not confirmed in time and may "
+                "still be saved. Resend it with the same report_id to check; "
+                "it will not be stored twice."
+            )
+        )
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -178,9 +475,10 @@ async def submit_health_report(report: HealthReportSubmission):
 # AI DETECTION ENGINE: SEVERITY-WEIGHTED STATISTICAL ANOMALY DETECTION
 # ============================================================================
 
-def get_severity_weight(severity: Optional[str]) -> float:
+def severity_weight_sql(column: str = "severity") -> str:
     """
-    Convert a severity string to a numeric weight for Z-score calculation.
+    Build a SQL CASE expression that converts a severity column to a numeric
+    weight for Z-score calculation, so weighting happens inside Postgres.
 
     Why weight by severity?
     Without weighting, 10 students with mild sniffles triggers the same alert
@@ -190,15 +488,131 @@ def get_severity_weight(severity: Optional[str]) -> float:
 
     Returns 1.0 (mild baseline) for any unknown or null severity value.
     """
-    return SEVERITY_WEIGHTS.get(severity or "mild", 1.0)
+    cases = " ".join(
+        f"WHEN '{severity}' THEN {weight}" for severity, weight in SEVERITY_WEIGHTS.items()
+    )
+    return f"CASE {column} {cases} ELSE 1.0 END"
+
+
+# Baseline window: one row per location with its weighted daily scores
+BASELINE_DAILY_SCORES_SQL = f"""
+    SELECT location, array_agg(weighted_score) AS daily_scores
+    FROM (
+        SELECT location,
+               (created_at AT TIME ZONE 'UTC')::date AS report_date,
+               SUM({severity_weight_sql()})::float8 AS weighted_score
+        FROM public.health_reports
+        WHERE created_at >= $1 AND created_at < $2
+        GROUP BY 1, 2
+    ) AS daily
+    GROUP BY location
+"""
+
+# Dominant reporter severity only feeds the DEBUG_ALERTS payload; mode()
+# ignores NULL severities
+DOMINANT_SEVERITY_SQL = (
+    ",\n               mode() WITHIN GROUP (ORDER BY severity) AS dominant_severity"
+    if DEBUG_ALERTS else ""
+)
+
+# Current window: one row per location with everything needed for alert content.
+# Symptom counts and their per-location top 3 are computed in one pass over
+# the unnested symptoms (GROUP BY + row_number), then joined on location.
+CURRENT_BY_LOCATION_SQL = f"""
+    WITH recent AS (
+        SELECT location, user_id, severity, symptoms,
+               {severity_weight_sql()} AS weight
+        FROM public.health_reports
+        WHERE created_at >= $1
+    ),
+    ranked_symptoms AS (
+        SELECT location, symptom,
+               row_number() OVER (
+                   PARTITION BY location ORDER BY COUNT(*) DESC, symptom
+               ) AS symptom_rank
+        FROM recent, unnest(recent.symptoms) AS symptom
+        GROUP BY location, symptom
+    ),
+    top_symptoms AS (
+        SELECT location, array_agg(symptom ORDER BY symptom_rank) AS top_symptoms
+        FROM ranked_symptoms
+        WHERE symptom_rank <= 3
+        GROUP BY location
+    ),
+    by_location AS (
+        SELECT location,
+               SUM(weight)::float8 AS weighted_score,
+               COUNT(*) AS report_count,
+               COUNT(DISTINCT user_id) AS unique_students{DOMINANT_SEVERITY_SQL}
+        FROM recent
+        GROUP BY location
+    )
+    SELECT by_location.*, top_symptoms.top_symptoms
+    FROM by_location
+    LEFT JOIN top_symptoms USING (location)
+"""
+
+
+def mean_and_stdev(values: Sequence[float]) -> Tuple[float, float]:
+    """
+    Mean and sample standard deviation (n-1) in one pass using Welford's
+    online algorithm.
+
+    Equivalent to statistics.mean + statistics.stdev, but walks the list once
+    with plain float arithmetic instead of twice with exact Fraction math.
+    Requires at least 2 values.
+    """
+    mean = 0.0
+    m2 = 0.0  # Running sum of squared deviations from the mean
+
+    for n, x in enumerate(values, start=1):
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+
+    return mean, math.sqrt(m2 / (len(values) - 1))
 
 
-def detect_outbreaks() -> List[Dict]:
+async def fetch_baseline_scores(
+    pool: asyncpg.Pool,
+    redis: Optional[Redis],
+    baseline_start: datetime,
+    baseline_end: datetime,
+) -> Dict[str, List[float]]:
+    """
+    Weighted daily baseline scores per location, served from Redis when
+    possible. The cache key is the baseline end date, which only changes at
+    UTC midnight. Redis failures fall back to querying Postgres so a cache
+    outage never blocks outbreak detection.
+    """
+    cache_key = f"baseline:{baseline_end.date().isoformat()}"
+
+    if redis is not None:
+        try:
+            cached = await redis.get(cache_key)
+            if cached is not None:
+                return json.loads(cached)
+        except RedisError:
+            pass
+
+    rows = await pool.fetch(BASELINE_DAILY_SCORES_SQL, baseline_start, baseline_end)
+    baseline_by_location = {row["location"]: row["daily_scores"] for row in rows}
+
+    if redis is not None:
+        try:
+            await redis.set(cache_key, json.dumps(baseline_by_location), ex=BASELINE_CACHE_TTL_SECONDS)
+        except RedisError:
+            pass
+
+    return baseline_by_location
+
+
+async def detect_outbreaks(pool: asyncpg.Pool, redis: Optional[Redis] = None) -> List[Dict]:
     """
     AI-powered outbreak detection using Severity-Weighted Statistical Anomaly Detection.
 
     **Algorithm:**
-    1. Fetch all health reports from the last 14 days (7-day baseline + current 24hrs)
+    1. Aggregate health reports from the last 14 days (7-day baseline + current 24hrs) in SQL
     2. For each location:
        a. Calculate a WEIGHTED daily score for the baseline:
               daily_score = sum(severity_weight for each report that day)
@@ -241,82 +655,39 @@ def detect_outbreaks() -> List[Dict]:
     # We need TWO time periods:
     # - BASELINE: 7-14 days ago (for calculating "normal" behavior)
     # - CURRENT: Last 24 hours (to detect if there's an anomaly NOW)
+    #
+    # The baseline covers 7 whole UTC days, so it is identical for every
+    # call made on the same day and can be cached.
     # ----------------------------------------------------------------------
 
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
     current_window_start = now - timedelta(days=1)  # Last 24 hours
-    baseline_start = now - timedelta(days=14)       # 14 days ago
-    baseline_end = now - timedelta(days=7)          # 7 days ago
+    baseline_start = today - timedelta(days=14)     # 14 days ago (midnight)
+    baseline_end = today - timedelta(days=7)        # 7 days ago (midnight)
 
-    # Step 2: Fetch historical baseline data (7-14 days ago)
+    # Step 2: Fetch baseline and current aggregates concurrently
     # ----------------------------------------------------------------------
-    # Only select the columns we need for efficiency
+    # Grouping and severity weighting run in Postgres:
+    # - BASELINE: each location's list of weighted daily scores (Redis-cached)
+    # - CURRENT: one row per location with weighted score, report/student
+    #   counts and its 3 most common symptoms
+    #
+    # The two fetches are independent, so each runs on its own pooled
+    # connection and the total wait is the slower one, not the sum of both.
     # ----------------------------------------------------------------------
 
-    baseline_response = supabase.table("health_reports").select(
-        "location, created_at, severity"
-    ).gte(
-        "created_at", baseline_start.isoformat()
-    ).lt(
-        "created_at", baseline_end.isoformat()
-    ).execute()
-
-    baseline_reports = baseline_response.data
-
-    # Step 3: Fetch current data (last 24 hours)
-    # ----------------------------------------------------------------------
-    # Need full data here for alert content (symptoms, user_ids, severity)
-    # ----------------------------------------------------------------------
-
-    current_response = supabase.table("health_reports").select(
-        "location, created_at, severity, symptoms, user_id"
-    ).gte(
-        "created_at", current_window_start.isoformat()
-    ).execute()
-
-    current_reports = current_response.data
+    baseline_by_location, current_rows = await asyncio.gather(
+        fetch_baseline_scores(pool, redis, baseline_start, baseline_end),
+        pool.fetch(CURRENT_BY_LOCATION_SQL, current_window_start),
+    )
 
-    # Step 4: Group reports by location
+    # Step 3: Index current aggregates by location
     # ----------------------------------------------------------------------
 
-    # Group baseline reports by location and date — accumulate WEIGHTED scores
-    baseline_by_location = {}
-    for report in baseline_reports:
-        location = report["location"]
-        report_date = report["created_at"][:10]  # Extract YYYY-MM-DD
-        weight = get_severity_weight(report.get("severity"))
-
-        if location not in baseline_by_location:
-            baseline_by_location[location] = {}
-
-        if report_date not in baseline_by_location[location]:
-            baseline_by_location[location][report_date] = 0.0
-
-        # Accumulate weighted score instead of raw count
-        baseline_by_location[location][report_date] += weight
-
-    # Group current reports by location — accumulate WEIGHTED scores + metadata
-    current_by_location = {}
-    for report in current_reports:
-        location = report["location"]
-        weight = get_severity_weight(report.get("severity"))
-
-        if location not in current_by_location:
-            current_by_location[location] = {
-                "weighted_score": 0.0,
-                "symptoms": [],
-                "user_ids": [],
-                "severities": []
-            }
+    current_by_location = {row["location"]: row for row in current_rows}
 
-        # Accumulate weighted score instead of raw count
-        current_by_location[location]["weighted_score"] += weight
-        current_by_location[location]["symptoms"].extend(report.get("symptoms", []))
-        current_by_location[location]["user_ids"].append(report["user_id"])
-        if report.get("severity"):
-            current_by_location[location]["severities"].append(report["severity"])
-
-    # Step 5: Calculate Z-Scores and Detect Anomalies
+    # Step 4: Calculate Z-Scores and Detect Anomalies
     # ----------------------------------------------------------------------
     # For each location, we calculate:
     # - μ (mean): Average WEIGHTED daily score during baseline period
@@ -331,7 +702,7 @@ def detect_outbreaks() -> List[Dict]:
 
         # Get baseline daily weighted scores for this location
         if location in baseline_by_location:
-            daily_scores = list(baseline_by_location[location].values())
+            daily_scores = baseline_by_location[location]
         else:
             # No historical data - use zeros (any reports will be anomalies)
             daily_scores = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
@@ -345,15 +716,16 @@ def detect_outbreaks() -> List[Dict]:
         # Mean represents the "normal" or "expected" weighted score per day
         # Formula: μ = (sum of all values) / (number of values)
         # Example: If weighted daily scores are [2.5, 3.0, 1.0, 2.5, 3.5, 2.0, 1.5], μ = 2.28
-        mean = statistics.mean(daily_scores)
-
+        #
         # **MATH STEP 2: Calculate Standard Deviation (σ)**
         # --------------------------------------------------
         # Standard deviation measures how "spread out" the data is
         # Formula: σ = sqrt(Σ(xᵢ - μ)² / (n-1))
         # - Low σ: Data is tightly clustered around mean (predictable)
         # - High σ: Data is widely spread (unpredictable)
-        std_dev = statistics.stdev(daily_scores)
+        #
+        # Both come from a single pass over the scores (see mean_and_stdev)
+        mean, std_dev = mean_and_stdev(daily_scores)
 
         # Handle edge case: if std_dev is 0 (all baseline values are identical),
         # we can't calculate a meaningful Z-score. Use a minimum threshold.
@@ -413,43 +785,110 @@ def detect_outbreaks() -> List[Dict]:
             else:
                 severity = "Low"
 
-            # Find most common symptoms in this location
-            symptom_counts = {}
-            for symptom in current_data["symptoms"]:
-                symptom_counts[symptom] = symptom_counts.get(symptom, 0) + 1
-
-            # Sort symptoms by frequency
-            common_symptoms = sorted(symptom_counts.items(), key=lambda x: x[1], reverse=True)
-            top_symptoms = [s[0] for s in common_symptoms[:3]]  # Top 3 symptoms
+            # 3 most common symptoms in this location (counted in SQL)
+            top_symptoms = current_data["top_symptoms"] or []
 
-            # Count unique affected students
-            unique_students = len(set(current_data["user_ids"]))
-
-            # Find the dominant severity among reporters at this location
-            sev_list = current_data["severities"]
-            dominant_severity = max(set(sev_list), key=sev_list.count) if sev_list else "mild"
+            # Unique affected students (COUNT(DISTINCT user_id) in SQL)
+            unique_students = current_data["unique_students"]
 
             # Create alert
-            alerts.append({
+            alert = {
                 "location": location,
                 "affected_students": unique_students,
                 "risk_score": round(risk_percentage, 1),
                 "severity": severity,
                 "common_symptoms": top_symptoms,
                 "detection_time": now.isoformat(),
-                "_debug": {
+            }
+
+            if DEBUG_ALERTS:
+                # Most common severity among reporters (computed in SQL)
+                dominant_severity = current_data["dominant_severity"] or "mild"
+
+                alert["_debug"] = {
                     "baseline_mean_weighted": round(mean, 2),
                     "baseline_std_dev": round(std_dev, 2),
                     "current_weighted_score": round(current_weighted, 2),
-                    "raw_report_count": len(current_data["user_ids"]),
+                    "raw_report_count": current_data["report_count"],
                     "z_score": round(z_score, 2),
                     "dominant_reporter_severity": dominant_severity,
                 }
-            })
+
+            alerts.append(alert)
 
     return alerts
 
 
+# Newest snapshot that is still fresh enough to serve
+LATEST_ALERTS_SNAPSHOT_SQL = """
+    SELECT alerts
+    FROM public.outbreak_alerts
+    WHERE created_at > now() - make_interval(secs => $1)
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+# Store a new snapshot and drop ones past retention in the same round trip
+INSERT_ALERTS_SNAPSHOT_SQL = """
+    WITH pruned AS (
+        DELETE FROM public.outbreak_alerts
+        WHERE created_at < now() - make_interval(secs => $2)
+    )
+    INSERT INTO public.outbreak_alerts (alerts) VALUES ($1::jsonb)
+"""
+
+
+async def refresh_outbreak_alerts(pool: asyncpg.Pool, redis: Optional[Redis] = None) -> List[Dict]:
+    """Run outbreak detection, store the result as a new snapshot and prune
+    snapshots older than ALERTS_SNAPSHOT_RETENTION_SECONDS"""
+    alerts = await detect_outbreaks(pool, redis)
+    await pool.execute(
+        INSERT_ALERTS_SNAPSHOT_SQL, json.dumps(alerts), float(ALERTS_SNAPSHOT_RETENTION_SECONDS)
+    )
+    return alerts
+
+
+async def run_alerts_scheduler(pool: asyncpg.Pool, redis: Optional[Redis] = None):
+    """
+    Background task: refresh the alerts snapshot every
+    ALERTS_REFRESH_INTERVAL_SECONDS until cancelled. A failed run is logged
+    and retried on the next tick instead of stopping the loop.
+    """
+    while True:
+        try:
+            await refresh_outbreak_alerts(pool, redis)
+        except Exception:
+            logger.exception("Scheduled outbreak detection failed")
+        await asyncio.sleep(ALERTS_REFRESH_INTERVAL_SECONDS)
+
+
+async def get_cached_alerts(pool: asyncpg.Pool, redis: Optional[Redis] = None) -> List[Dict]:
+    """
+    Return the latest outbreak alerts snapshot, reading the database at most
+    once per ALERTS_CACHE_TTL_SECONDS. The lock makes concurrent requests that
+    arrive on an expired cache wait for a single read instead of each
+    starting their own.
+    """
+    if time.monotonic() < _alerts_cache["expires_at"]:
+        return _alerts_cache["alerts"]
+
+    async with _alerts_cache_lock:
+        # Another request may have refreshed the cache while we waited
+        if time.monotonic() < _alerts_cache["expires_at"]:
+            return _alerts_cache["alerts"]
+
+        snapshot = await pool.fetchval(LATEST_ALERTS_SNAPSHOT_SQL, float(ALERTS_SNAPSHOT_MAX_AGE_SECONDS))
+        if snapshot is not None:
+            alerts = json.loads(snapshot)
+        else:
+            # Scheduler hasn't produced a recent snapshot - compute one now
+            alerts = await refresh_outbreak_alerts(pool, redis)
+
+        _alerts_cache["alerts"] = alerts
+        _alerts_cache["expires_at"] = time.monotonic() + ALERTS_CACHE_TTL_SECONDS
+        return alerts
+
+
 # ============================================================================
 # ENDPOINT 2: GET OUTBREAK ALERTS
 # ============================================================================
@@ -473,6 +912,9 @@ async def get_outbreak_alerts():
     ]
     ```
 
+    Alerts are recomputed in the background every 5 minutes; this endpoint
+    serves the latest stored snapshot (cached in-process for 60s).
+
     **Risk Score:** Calculated via severity-weighted Z-score (higher = more unusual/severe)
     **Severity:**
     - Low: 40-50% risk (Z = 2.0-2.5)
@@ -480,7 +922,7 @@ async def get_outbreak_alerts():
     - High: 70-100% risk (Z > 3.5)
     """
     try:
-        alerts = detect_outbreaks()
+        alerts = await get_cached_alerts(await get_db_pool(), redis_client)
         return alerts
 
     except Exception as e:
@@ -521,7 +963,7 @@ if __name__ == "__main__":
 
     📍 URL: http://localhost:{FASTAPI_PORT}
     📚 Docs: http://localhost:{FASTAPI_PORT}/docs
-    🔗 Supabase: {SUPABASE_URL}
+    🔗 Database: {urlparse(DATABASE_URL).hostname}
 
     Ready to detect outbreaks! 🚀
     """)
@@ -533,5 +975,6 @@ if __name__ == "__main__":
         reload=True  # Auto-reload on code changes (dev mode)
     )
 
-# Vercel serverless handler
-handler = Mangum(app)
\ No newline at end of file
+# Vercel serverless handler. lifespan="off": Mangum would otherwise run the
+# startup/shutdown cycle (pool, writer, scheduler) on every invocation.
+handler = Mangum(app, lifespan="off")
\ No newline at end of file
@@ -20,8 +20,8 @@ Requirements:
 
 import os
 import sys
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
 import random
 
 from supabase import create_client, Client
@@ -56,6 +56,9 @@ BASELINE_REPORTS_PER_DAY = 2  # Normal activity level
 OUTBREAK_REPORTS = 8  # Spike to trigger HIGH alert
 OUTBREAK_LOCATION = "Hostel A"  # Where the outbreak occurs
 
+# Rows per insert request (PostgREST accepts a JSON array for bulk inserts)
+INSERT_BATCH_SIZE = 1000
+
 # ============================================================================
 # FUNCTIONS
 # ============================================================================
@@ -63,13 +66,12 @@ OUTBREAK_LOCATION = "Hostel A"  # Where the outbreak occurs
 def get_random_user_id() -> str:
     """Fetch a random user ID from the database"""
     try:
-        response = supabase.table("profiles").select("user_id").limit(10).execute()
+        response = supabase.table("profiles").select("user_id").limit(1).execute()
 
         if not response.data:
             print("❌ Error: No users found in database. Please register at least one user first.")
             sys.exit(1)
 
-        # Return first user (or random if you want)
         return response.data[0]["user_id"]
 
     except Exception as e:
@@ -77,83 +79,98 @@ def get_random_user_id() -> str:
         sys.exit(1)
 
 
-def insert_health_report(user_id: str, symptoms: List[str], temperature: float, location: str, date: datetime):
-    """Insert a health report with a specific timestamp"""
-    try:
-        supabase.table("health_reports").insert({
-            "user_id": user_id,
-            "symptoms": symptoms,
-            "temperature": temperature,
-            "location": location,
-            "created_at": date.isoformat()
-        }).execute()
-    except Exception as e:
-        print(f"❌ Error inserting report: {e}")
+def build_health_report(user_id: str, symptoms: List[str], temperature: float, location: str, created_at: str) -> Dict:
+    """Build a health report row with a specific (ISO 8601) timestamp"""
+    return {
+        "user_id": user_id,
+        "symptoms": symptoms,
+        "temperature": temperature,
+        "location": location,
+        "created_at": created_at
+    }
 
 
-def generate_baseline_data():
+def insert_health_reports(reports: List[Dict]):
+    """Insert health reports in bulk (one request per INSERT_BATCH_SIZE rows)"""
+    for start in range(0, len(reports), INSERT_BATCH_SIZE):
+        batch = reports[start:start + INSERT_BATCH_SIZE]
+        try:
+            supabase.table("health_reports").insert(batch).execute()
+        except Exception as e:
+            print(f"❌ Error inserting reports {start + 1}-{start + len(batch)}: {e}")
+
+
+def generate_baseline_data(user_id: str) -> List[Dict]:
     """Generate normal baseline data (7-14 days ago)"""
     print("\n📊 Generating baseline data (7-14 days ago)...")
 
-    user_id = get_random_user_id()
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
+    reports = []
 
     # Generate data for each day in the baseline period
     for days_ago in range(BASELINE_START_DAYS, BASELINE_END_DAYS, -1):
-        date = now - timedelta(days=days_ago)
+        # Every report on this day shares one timestamp - format it once
+        created_at = (now - timedelta(days=days_ago)).isoformat()
 
         # Create 2-3 reports per day (normal activity)
         num_reports = random.randint(2, 3)
 
-        for _ in range(num_reports):
-            # Random location
-            location = random.choice(LOCATIONS)
+        # Draw each column for the whole day at once - random locations
+        locations = random.choices(LOCATIONS, k=num_reports)
 
-            # Mild symptoms (baseline = mostly healthy)
-            symptoms = random.sample(["fatigue", "headache"], k=random.randint(0, 1))
+        # Mild symptoms (baseline = mostly healthy): none half the time,
+        # otherwise one of fatigue/headache
+        symptom_sets = random.choices([[], ["fatigue"], ["headache"]], weights=[2, 1, 1], k=num_reports)
 
-            # Normal temperature
-            temperature = round(random.uniform(36.5, 37.2), 1)
+        # Normal temperature
+        temperatures = [round(random.uniform(36.5, 37.2), 1) for _ in range(num_reports)]
 
-            insert_health_report(user_id, symptoms, temperature, location, date)
+        reports.extend(
+            build_health_report(user_id, symptoms, temperature, location, created_at)
+            for location, symptoms, temperature in zip(locations, symptom_sets, temperatures)
+        )
 
         print(f"  ✓ Day {days_ago} ago: {num_reports} reports")
 
     print(f"✅ Baseline data created: {BASELINE_START_DAYS - BASELINE_END_DAYS} days of normal activity")
+    return reports
 
 
-def generate_outbreak_data():
+def generate_outbreak_data(user_id: str) -> List[Dict]:
     """Generate outbreak data (last 24 hours) - ANOMALOUS SPIKE"""
     print(f"\n🚨 Generating outbreak data ({OUTBREAK_LOCATION})...")
 
-    user_id = get_random_user_id()
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
+    reports = []
 
-    # Create outbreak in the last 24 hours
-    for i in range(OUTBREAK_REPORTS):
-        # Spread reports across the last 24 hours
-        hours_ago = random.randint(0, 23)
-        date = now - timedelta(hours=hours_ago)
+    # Timestamps for each of the last 24 hours, formatted once
+    hourly_timestamps = [(now - timedelta(hours=hours_ago)).isoformat() for hours_ago in range(24)]
 
+    # Spread reports across the last 24 hours
+    timestamps = random.choices(hourly_timestamps, k=OUTBREAK_REPORTS)
+
+    # Elevated temperatures
+    temperatures = [round(random.uniform(37.8, 39.5), 1) for _ in range(OUTBREAK_REPORTS)]
+
+    # Create outbreak in the last 24 hours
+    for i, (created_at, temperature) in enumerate(zip(timestamps, temperatures)):
         # Outbreak symptoms (severe)
         symptoms = random.sample(["fever", "cough", "headache", "body ache", "fatigue"], k=random.randint(2, 4))
 
-        # Elevated temperature
-        temperature = round(random.uniform(37.8, 39.5), 1)
-
-        insert_health_report(user_id, symptoms, temperature, OUTBREAK_LOCATION, date)
+        reports.append(build_health_report(user_id, symptoms, temperature, OUTBREAK_LOCATION, created_at))
 
         print(f"  ✓ Report {i+1}: {', '.join(symptoms)}, {temperature}°C")
 
     print(f"✅ Outbreak data created: {OUTBREAK_REPORTS} reports in {OUTBREAK_LOCATION}")
+    return reports
 
 
 def verify_data():
     """Verify the data was inserted correctly"""
     print("\n🔍 Verifying data...")
 
-    # Count total reports
-    response = supabase.table("health_reports").select("*", count="exact").execute()
+    # Count total reports (head=True returns only the count, no row payloads)
+    response = supabase.table("health_reports").select("id", count="exact", head=True).execute()
     total_reports = response.count if hasattr(response, 'count') else len(response.data)
 
     # Count reports by location
@@ -206,13 +223,20 @@ def main():
         return
 
     try:
+        # Reports are attributed to one existing user for the whole run
+        user_id = get_random_user_id()
+
         # Step 1: Generate baseline
-        generate_baseline_data()
+        reports = generate_baseline_data(user_id)
 
         # Step 2: Generate outbreak
-        generate_outbreak_data()
+        reports += generate_outbreak_data(user_id)
+
+        # Step 3: Insert everything in bulk
+        print(f"\n💾 Inserting {len(reports)} reports...")
+        insert_health_reports(reports)
 
-        # Step 3: Verify
+        # Step 4: Verify
         verify_data()
 
         print("""
@@ -0,0 +1,75 @@
+-- ============================================================================
+-- EPISCAN OUTBREAK DETECTION INDEXES MIGRATION
+-- ============================================================================
+-- The outbreak detector (backend/api/index.py) runs two range queries on
+-- health_reports:
+--   - baseline: created_at from UTC midnight 14 days ago up to UTC midnight
+--     7 days ago, grouped by (location, day) with a severity-weighted SUM
+--   - current:  created_at >= now() - 1 day, grouped by location
+--
+-- Both filter on created_at only, so the leading index column must be
+-- created_at. The (location, created_at DESC) index from Integrations.md is
+-- kept for per-location lookups but cannot serve these range scans.
+--
+-- This migration replaces the plain created_at index from Integrations.md
+-- with a covering one. Keeping both would mean two created_at btrees to
+-- update on every check-in insert for no read benefit.
+--
+-- CREATE INDEX CONCURRENTLY avoids locking health_reports against check-ins
+-- while the index builds. It cannot run inside a transaction block, so run
+-- each statement on its own (e.g. with psql) rather than as one script in
+-- the Supabase SQL Editor.
+-- ============================================================================
+
+-- ============================================================================
+-- STEP 1: COVERING INDEX FOR THE BASELINE AGGREGATION
+-- ============================================================================
+-- Carries location and severity in the index leaf pages so the baseline
+-- GROUP BY can be answered with an index-only scan, without visiting the
+-- heap rows (and their symptoms/notes payloads) at all. Being led by
+-- created_at, it also serves every range scan the plain index did.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_health_reports_created_at_covering
+  ON public.health_reports(created_at)
+  INCLUDE (location, severity);
+
+-- ============================================================================
+-- STEP 2: DROP THE NOW-REDUNDANT PLAIN created_at INDEX
+-- ============================================================================
+-- A failed or interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index
+-- behind, and IF NOT EXISTS then silently skips it on a re-run. Dropping the
+-- plain index at that point would leave no usable created_at index, so check
+-- first and only run the DROP if this reports the covering index as valid.
+
+DO $$
+BEGIN
+  IF NOT COALESCE((
+    SELECT indisvalid FROM pg_index
+    WHERE indexrelid = to_regclass('public.idx_health_reports_created_at_covering')
+  ), false) THEN
+    RAISE EXCEPTION 'idx_health_reports_created_at_covering is missing or INVALID; keep idx_health_reports_created_at'
+      USING HINT = 'DROP INDEX CONCURRENTLY IF EXISTS public.idx_health_reports_created_at_covering; then re-run STEP 1.';
+  END IF;
+  RAISE NOTICE 'idx_health_reports_created_at_covering is valid; safe to drop the plain index.';
+END $$;
+
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_health_reports_created_at;
+
+-- Refresh planner statistics so the new index is picked up immediately
+ANALYZE public.health_reports;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+-- Expect "Index Only Scan using idx_health_reports_created_at_covering"
+-- (or an Index Scan on a small table) instead of "Seq Scan":
+--
+-- EXPLAIN (ANALYZE, BUFFERS)
+-- SELECT location,
+--        (created_at AT TIME ZONE 'UTC')::date AS report_date,
+--        SUM(CASE severity WHEN 'mild' THEN 1.0 WHEN 'moderate' THEN 1.5
+--                          WHEN 'severe' THEN 2.5 ELSE 1.0 END)::float8
+-- FROM public.health_reports
+-- WHERE created_at >= (date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') - interval '14 days'
+--   AND created_at <  (date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') - interval '7 days'
+-- GROUP BY 1, 2;
@@ -0,0 +1,66 @@
+-- ============================================================================
+-- EPISCAN OUTBREAK ALERTS SNAPSHOT MIGRATION
+-- ============================================================================
+-- This migration adds the outbreak_alerts table. The FastAPI backend runs
+-- outbreak detection in the background every few minutes and stores each
+-- result here as one snapshot row; GET /alerts serves the newest snapshot
+-- instead of re-running detection on every request.
+--
+-- Run this in your Supabase SQL Editor.
+-- ============================================================================
+
+-- ============================================================================
+-- STEP 1: CREATE TABLE
+-- ============================================================================
+
+-- One row per detection run; alerts holds the full /alerts response body
+CREATE TABLE IF NOT EXISTS public.outbreak_alerts (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  alerts JSONB NOT NULL DEFAULT '[]'::jsonb,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- ============================================================================
+-- STEP 2: CREATE INDEXES
+-- ============================================================================
+
+-- Serves "newest snapshot within the last N minutes"
+CREATE INDEX IF NOT EXISTS idx_outbreak_alerts_created_at
+  ON public.outbreak_alerts(created_at DESC);
+
+-- ============================================================================
+-- STEP 3: ENABLE ROW LEVEL SECURITY (RLS)
+-- ============================================================================
+-- No policies: only the backend (connecting with the database role via
+-- DATABASE_URL) reads and writes this table.
+
+ALTER TABLE public.outbreak_alerts ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================================
+-- STEP 4: HOUSEKEEPING
+-- ============================================================================
+-- No cleanup job needed: the backend deletes snapshots older than 24 hours
+-- in the same statement that stores each new one.
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+  RAISE NOTICE '';
+  RAISE NOTICE '========================================';
+  RAISE NOTICE '✅ OUTBREAK ALERTS MIGRATION COMPLETE';
+  RAISE NOTICE '========================================';
+  RAISE NOTICE '';
+  RAISE NOTICE 'Tables Created:';
+  RAISE NOTICE '  • outbreak_alerts';
+  RAISE NOTICE '';
+  RAISE NOTICE 'Indexes Created: 1';
+  RAISE NOTICE '';
+  RAISE NOTICE 'Next Steps:';
+  RAISE NOTICE '  1. Restart the backend';
+  RAISE NOTICE '  2. Verify snapshots: SELECT created_at, alerts FROM outbreak_alerts ORDER BY created_at DESC LIMIT 5;';
+  RAISE NOTICE '';
+  RAISE NOTICE '========================================';
+END $$;